@@ -1,43 +1,150 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
 import errno
+import functools
 import os
 import pathlib
+import re
+import selectors
 import shutil
 import socket
 import stat
 import subprocess
+import sys
 import tempfile
 import time
-from typing import Iterable
+from typing import Callable, Iterable, TypeVar
 
+_T = TypeVar("_T")
+_R = TypeVar("_R")
 
-def nodriver_temp_base() -> pathlib.Path:
-    """
-    Dedicated nodriver temp base directory.
 
-    Keeping everything under a single directory makes it easy to clean up and avoids
-    spraying files in the current working directory.
-    """
-    base = pathlib.Path(tempfile.gettempdir()) / "nodriver"
+@functools.lru_cache(maxsize=None)
+def _make_nodriver_temp_base(tmp_dir: str) -> pathlib.Path:
+    base = pathlib.Path(tmp_dir) / "nodriver"
     try:
         base.mkdir(parents=True, exist_ok=True)
     except Exception:
         # Fall back to the system temp dir if creating our own folder fails.
-        base = pathlib.Path(tempfile.gettempdir())
+        base = pathlib.Path(tmp_dir)
     return base
 
 
-def nodriver_temp_dir(name: str) -> pathlib.Path:
-    base = nodriver_temp_base() / name
+@functools.lru_cache(maxsize=None)
+def _make_nodriver_temp_dir(tmp_dir: str, name: str) -> pathlib.Path:
+    base = _make_nodriver_temp_base(tmp_dir) / name
     try:
         base.mkdir(parents=True, exist_ok=True)
     except Exception:
-        return nodriver_temp_base()
+        return _make_nodriver_temp_base(tmp_dir)
     return base
 
 
-def _iter_chromium_singleton_dirs(tmp_dir: pathlib.Path) -> Iterable[pathlib.Path]:
+def _cached_temp_dir(make: Callable[..., pathlib.Path], *key: str) -> pathlib.Path:
+    """
+    Return the directory `make(*key)` created earlier, recreating it when it is gone.
+
+    One stat per call instead of a mkdir per level; the key includes
+    `tempfile.gettempdir()`, so a changed `tempfile.tempdir` is picked up.
+    """
+    path = make(*key)
+    if not os.path.isdir(path):
+        # Removed from outside the process (e.g. a tmp cleaner); create it again.
+        _make_nodriver_temp_dir.cache_clear()
+        _make_nodriver_temp_base.cache_clear()
+        path = make(*key)
+    return path
+
+
+def nodriver_temp_base() -> pathlib.Path:
+    """
+    Dedicated nodriver temp base directory.
+
+    Keeping everything under a single directory makes it easy to clean up and avoids
+    spraying files in the current working directory.
+    """
+    return _cached_temp_dir(_make_nodriver_temp_base, tempfile.gettempdir())
+
+
+def nodriver_temp_dir(name: str) -> pathlib.Path:
+    return _cached_temp_dir(_make_nodriver_temp_dir, tempfile.gettempdir(), name)
+
+
+def _cleanup_pool_size(n_items: int) -> int:
+    return max(1, min(32, (os.cpu_count() or 1) * 4, n_items))
+
+
+def _run_io_bound(fn: Callable[[_T], _R], items: list[_T]) -> list[_R]:
+    """
+    Apply `fn` to every item, concurrently when there is more than one.
+
+    Cleanup work is dominated by blocking syscalls (stat, scandir), so a
+    thread pool overlaps the waits instead of paying them one after another.
+    """
+    if not items:
+        return []
+    if len(items) == 1:
+        return [fn(items[0])]
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=_cleanup_pool_size(len(items))
+    ) as pool:
+        return list(pool.map(fn, items))
+
+
+# Paths per `rm` invocation; keeps the argv comfortably below ARG_MAX.
+_RM_BATCH_SIZE = 1000
+
+
+def _remove_dirs(paths: list[str]) -> None:
+    """
+    Remove directories, using a single `/bin/rm -rf` exec per batch on POSIX.
+
+    One exec for all victims amortizes the fork/exec cost that otherwise dominates
+    removing small directories.
+    """
+    if not paths:
+        return
+    if os.name == "posix" and os.path.exists("/bin/rm"):
+        for i in range(0, len(paths), _RM_BATCH_SIZE):
+            try:
+                subprocess.run(
+                    ["/bin/rm", "-rf", "--", *paths[i : i + _RM_BATCH_SIZE]],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=False,
+                )
+            except Exception:
+                pass
+        return
+    for path in paths:
+        try:
+            shutil.rmtree(path, ignore_errors=True)
+        except Exception:
+            pass
+
+
+# Name prefixes of the singleton dirs Chromium/Chrome create in the system temp dir.
+CHROMIUM_SINGLETON_PREFIXES = (
+    "org.chromium.Chromium.",
+    ".org.chromium.Chromium.",
+    "com.google.Chrome.",
+    ".com.google.Chrome.",
+)
+
+
+def _is_chromium_singleton_dir(entry: os.DirEntry) -> bool:
+    # Cheapest filter first: the name needs no syscall, while is_dir() may need an
+    # lstat when the filesystem doesn't report d_type.
+    if not entry.name.startswith(CHROMIUM_SINGLETON_PREFIXES):
+        return False
+    if not entry.is_dir(follow_symlinks=False):
+        return False
+    return os.path.lexists(entry.path + "/SingletonSocket")
+
+
+def _iter_chromium_singleton_dirs(tmp_dir: str) -> Iterable[str]:
     """
     Yield Chromium/Chrome "singleton" socket directories in the system temp dir.
 
@@ -45,96 +152,189 @@ def _iter_chromium_singleton_dirs(tmp_dir: pathlib.Path) -> Iterable[pathlib.Pat
       /tmp/org.chromium.Chromium.<random>/
     containing files such as SingletonSocket/SingletonCookie. These can leak on crashes.
     """
-    prefixes = (
-        "org.chromium.Chromium.",
-        ".org.chromium.Chromium.",
-        "com.google.Chrome.",
-        ".com.google.Chrome.",
-    )
     try:
-        with os.scandir(str(tmp_dir)) as it:
+        with os.scandir(tmp_dir) as it:
             for entry in it:
-                if not entry.is_dir(follow_symlinks=False):
-                    continue
-                name = entry.name
-                if not any(name.startswith(p) for p in prefixes):
-                    continue
-                p = pathlib.Path(entry.path)
-                if (p / "SingletonSocket").exists():
-                    yield p
+                if _is_chromium_singleton_dir(entry):
+                    yield entry.path
     except Exception:
         return
 
 
-def _socket_is_listening(sock_path: pathlib.Path, timeout: float = 0.15) -> bool:
+def _scan_tempdir_once() -> tuple[list[str], list[os.DirEntry]]:
+    """
+    Classify the system temp dir in a single scandir pass.
+
+    Returns (chromium singleton dirs, uc_* entries), the pre-scanned inputs for
+    `cleanup_chromium_singleton_dirs` and `cleanup_stale_uc_profile_dirs`.
+    """
+    singleton_dirs: list[str] = []
+    uc_entries: list[os.DirEntry] = []
     try:
-        st = sock_path.stat()
-    except FileNotFoundError:
-        return False
+        with os.scandir(tempfile.gettempdir()) as it:
+            for entry in it:
+                try:
+                    if entry.name.startswith("uc_"):
+                        uc_entries.append(entry)
+                    elif _is_chromium_singleton_dir(entry):
+                        singleton_dirs.append(entry.path)
+                except Exception:
+                    continue
     except Exception:
-        # Unknown state; be conservative and don't delete.
-        return True
+        pass
+    return singleton_dirs, uc_entries
 
-    # If Chromium left behind a non-socket file here, treat it as stale.
-    if not stat.S_ISSOCK(st.st_mode):
-        return False
 
-    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-    s.settimeout(timeout)
+# Liveness states reported by `_probe_sockets`.
+SOCKET_LIVE = "live"
+SOCKET_DEAD_DEFINITIVE = "dead"
+SOCKET_UNKNOWN = "unknown"
+
+
+# Sockets probed per selector batch; bounds the number of fds open at once.
+_PROBE_BATCH_SIZE = 256
+
+
+def _probe_sockets(sock_paths: list[str], timeout: float = 0.15) -> dict[str, str]:
+    """
+    Probe many SingletonSockets concurrently from a single thread.
+
+    Every socket gets a non-blocking connect; the ones still in progress share a single
+    selector wait of at most `timeout`, instead of each blocking for up to `timeout`.
+    Returns a mapping of path to SOCKET_* state.
+    """
+    states: dict[str, str] = {}
+    for i in range(0, len(sock_paths), _PROBE_BATCH_SIZE):
+        states.update(_probe_socket_batch(sock_paths[i : i + _PROBE_BATCH_SIZE], timeout))
+    return states
+
+
+def _connect_error_state(err: int) -> str:
+    if err == 0:
+        return SOCKET_LIVE
+    if err in (errno.ENOENT, errno.ECONNREFUSED):
+        return SOCKET_DEAD_DEFINITIVE
+    # Permission / busy backlog / other errors: may be a busy peer, retry later.
+    return SOCKET_UNKNOWN
+
+
+def _probe_socket_batch(sock_paths: list[str], timeout: float) -> dict[str, str]:
+    states: dict[str, str] = {}
+    sel = selectors.DefaultSelector()
     try:
-        s.connect(str(sock_path))
-        return True
-    except OSError as e:
-        if e.errno in (errno.ENOENT, errno.ECONNREFUSED):
-            return False
-        # Timeout / permission / other errors: treat as active to be safe.
-        return True
-    finally:
-        try:
+        for sock_path in sock_paths:
+            try:
+                st = os.lstat(sock_path)
+            except FileNotFoundError:
+                states[sock_path] = SOCKET_DEAD_DEFINITIVE
+                continue
+            except Exception:
+                # Unknown state; be conservative and don't delete.
+                states[sock_path] = SOCKET_UNKNOWN
+                continue
+
+            # If Chromium left behind a non-socket file here, treat it as stale.
+            # Symlinks are left to connect(), which resolves them.
+            if not stat.S_ISSOCK(st.st_mode) and not stat.S_ISLNK(st.st_mode):
+                states[sock_path] = SOCKET_DEAD_DEFINITIVE
+                continue
+
+            try:
+                s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                s.setblocking(False)
+            except Exception:
+                states[sock_path] = SOCKET_UNKNOWN
+                continue
+            try:
+                err = s.connect_ex(sock_path)
+            except Exception:
+                err = -1
+            if err == errno.EINPROGRESS:
+                sel.register(s, selectors.EVENT_WRITE, sock_path)
+                continue
+            states[sock_path] = _connect_error_state(err)
             s.close()
-        except Exception:
-            pass
+
+        deadline = time.monotonic() + timeout
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in sel.select(remaining):
+                s = key.fileobj
+                err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                states[key.data] = _connect_error_state(err)
+                sel.unregister(s)
+                s.close()
+
+        # Still connecting after the timeout: a hung peer, not provably dead.
+        for key in list(sel.get_map().values()):
+            states[key.data] = SOCKET_UNKNOWN
+            sel.unregister(key.fileobj)
+            key.fileobj.close()
+    finally:
+        sel.close()
+    return states
+
+
+def _sockets_definitely_dead(
+    sock_paths: list[str],
+    attempts: int,
+    base: float = 0.05,
+    cap: float = 0.3,
+    factor: float = 2.0,
+) -> set[str]:
+    """
+    Return the sockets that were seen definitively dead.
+
+    Inconclusive probes are retried with exponential backoff (base, base*factor, ... capped
+    at `cap`). A live socket, or one that stays inconclusive, is not reported as dead.
+    """
+    attempts = max(1, attempts)
+    dead: set[str] = set()
+    pending = list(sock_paths)
+    for i in range(attempts):
+        states = _probe_sockets(pending)
+        dead.update(p for p in pending if states[p] == SOCKET_DEAD_DEFINITIVE)
+        pending = [p for p in pending if states[p] == SOCKET_UNKNOWN]
+        if not pending:
+            break
+        if i < attempts - 1:
+            time.sleep(min(cap, base * factor**i))
+    return dead
 
 
 def cleanup_chromium_singleton_dirs(
     *,
     retries: int = 5,
-    retry_delay: float = 0.15,
+    retry_delay: float = 0.05,
+    retry_delay_max: float = 0.3,
+    singleton_dirs: list[str] | None = None,
 ) -> None:
     """
     Best-effort cleanup for stale Chromium/Chrome singleton temp dirs.
 
     Safe behavior:
     - Only touches dirs in `tempfile.gettempdir()` that match known Chromium/Chrome patterns.
-    - Only deletes dirs whose SingletonSocket is not accepting connections after a few retries.
-    """
-    tmp_dir = pathlib.Path(tempfile.gettempdir())
-    for d in _iter_chromium_singleton_dirs(tmp_dir):
-        sock_path = d / "SingletonSocket"
+    - Only deletes dirs whose SingletonSocket is definitively gone or refusing connections.
+      Inconclusive probes are retried with exponential backoff, starting at `retry_delay`
+      and capped at `retry_delay_max`.
 
-        active = False
-        for i in range(max(1, retries)):
-            if _socket_is_listening(sock_path):
-                active = True
-                break
-            if i < retries - 1:
-                time.sleep(retry_delay)
-        if active:
-            continue
+    `singleton_dirs` takes singleton dir paths already found by a previous scan of
+    the system temp dir (see `cleanup_all()`); by default the temp dir is scanned here.
+    """
+    if singleton_dirs is None:
+        candidates = list(_iter_chromium_singleton_dirs(tempfile.gettempdir()))
+    else:
+        candidates = list(singleton_dirs)
+    if not candidates:
+        return
 
-        # Stale: remove directory.
-        try:
-            if os.name == "posix" and os.path.exists("/bin/rm"):
-                subprocess.run(
-                    ["/bin/rm", "-rf", str(d)],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    check=False,
-                )
-            else:
-                shutil.rmtree(str(d), ignore_errors=True)
-        except Exception:
-            pass
+    sockets = {d + "/SingletonSocket": d for d in candidates}
+    dead = _sockets_definitely_dead(
+        list(sockets), retries, base=retry_delay, cap=retry_delay_max
+    )
+    _remove_dirs([d for sock_path, d in sockets.items() if sock_path in dead])
 
 
 def _posix_ps_command_output() -> str:
@@ -159,66 +359,108 @@ def _posix_ps_command_output() -> str:
         return ""
 
 
-def _posix_proc_cmdline_snapshot() -> str:
+_USER_DATA_DIR_ARG = b"--user-data-dir"
+# For command lines rewritten into one space-separated string (e.g. via setproctitle).
+_USER_DATA_DIR_RE = re.compile(rb"--user-data-dir[ =](\S+)")
+
+
+def _active_user_data_dirs() -> set[str] | None:
     """
-    Fallback cmdline snapshot for minimal containers where `ps` isn't available.
+    Collect the --user-data-dir values of all running processes from /proc.
 
-    We only need a coarse "is any process referencing this path" signal, so a single
-    concatenated string is sufficient and keeps call sites simple.
+    Reads /proc/<pid>/cmdline directly instead of exec'ing `ps`, so an activity check
+    becomes a set lookup. Returns None when /proc isn't available (e.g. macOS), in which
+    case callers fall back to `_posix_ps_command_output()`.
     """
-    if os.name != "posix":
-        return ""
-    proc_dir = pathlib.Path("/proc")
-    if not proc_dir.exists():
-        return ""
-    out: list[str] = []
+    if not sys.platform.startswith("linux"):
+        return None
+    active: set[str] = set()
     try:
-        for entry in proc_dir.iterdir():
+        it = os.scandir("/proc")
+    except OSError:
+        return None
+    with it:
+        for entry in it:
             if not entry.name.isdigit():
                 continue
-            cmdline = entry / "cmdline"
             try:
-                data = cmdline.read_bytes()
-            except Exception:
+                with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                    data = f.read()
+            except OSError:
+                # Exited in the meantime, or not ours to read.
                 continue
-            if not data:
+            if _USER_DATA_DIR_ARG not in data:
                 continue
             # /proc/<pid>/cmdline is NUL-separated.
-            try:
-                s = data.replace(b"\x00", b" ").decode("utf-8", errors="ignore")
-            except Exception:
-                continue
-            out.append(s)
-    except Exception:
-        return ""
-    return "\n".join(out)
+            args = data.split(b"\x00")
+            for i, arg in enumerate(args):
+                if arg.startswith(_USER_DATA_DIR_ARG + b"="):
+                    values = [arg[len(_USER_DATA_DIR_ARG) + 1 :]]
+                elif arg == _USER_DATA_DIR_ARG and i + 1 < len(args):
+                    values = [args[i + 1]]
+                elif _USER_DATA_DIR_ARG in arg:
+                    values = _USER_DATA_DIR_RE.findall(arg)
+                else:
+                    continue
+                for value in values:
+                    if value:
+                        active.add(os.path.normpath(os.fsdecode(value)))
+    return active
 
 
-def _looks_like_chrome_user_data_dir(path: pathlib.Path) -> bool:
+@functools.lru_cache(maxsize=None)
+def _realpath_cached(path: str) -> str:
     try:
-        # Common top-level artifacts in Chrome/Chromium user-data-dir.
-        if (path / "Local State").is_file():
-            return True
-        if (path / "Default").is_dir():
-            return True
-        if (path / "Last Version").is_file():
-            return True
+        return os.path.realpath(path)
     except Exception:
-        pass
-    return False
+        return path
+
+
+def _referenced_user_data_dirs(cmdlines: str, paths: Iterable[str]) -> set[str]:
+    """
+    Return the subset of `paths` passed as --user-data-dir in `cmdlines`.
+
+    All paths are folded into one compiled pattern, so the (potentially large) command
+    line snapshot is scanned once instead of once per path.
+    """
+    paths = sorted(set(paths), key=len, reverse=True)
+    if not paths or not cmdlines:
+        return set()
+    pattern = re.compile(
+        r"--user-data-dir[ =]("
+        + "|".join(re.escape(p) for p in paths)
+        + r")(?=/?(?:\s|$))"
+    )
+    return {m.group(1) for m in pattern.finditer(cmdlines)}
 
 
-def _is_empty_dir(path: pathlib.Path) -> bool:
+def _profile_dir_state(path: str) -> tuple[bool, bool]:
+    """
+    Return (is_empty, looks_like_chrome_user_data_dir) from a single scandir pass.
+
+    Looks for the common top-level artifacts of a Chrome/Chromium user-data-dir.
+    """
     try:
-        with os.scandir(str(path)) as it:
-            return next(it, None) is None
+        with os.scandir(path) as it:
+            empty = True
+            for entry in it:
+                empty = False
+                name = entry.name
+                if name in ("Local State", "Last Version"):
+                    if entry.is_file():
+                        return False, True
+                elif name == "Default":
+                    if entry.is_dir():
+                        return False, True
+            return empty, False
     except Exception:
-        return False
+        return False, False
 
 
 def cleanup_stale_uc_profile_dirs(
     *,
     min_age_seconds: float = 120.0,
+    uc_entries: list[os.DirEntry] | None = None,
 ) -> None:
     """
     Clean up stale nodriver temp profiles.
@@ -236,88 +478,132 @@ def cleanup_stale_uc_profile_dirs(
     - Only deletes directories that look like a Chrome user-data-dir or are empty.
     - Skips directories referenced by a running process command line containing --user-data-dir=<path>.
     - Skips very recent directories to avoid races with a concurrently starting browser.
+
+    `uc_entries` takes the uc_* entries of a previous scan of the system temp dir
+    (see `cleanup_all()`); by default the temp dir is scanned here. They must come
+    from `tempfile.gettempdir()` itself: entries are only filtered again by name.
     """
     now = time.time()
-    ps_out = _posix_ps_command_output() or _posix_proc_cmdline_snapshot()
-    can_check_activity = bool(ps_out)
+    active_dirs = _active_user_data_dirs()
+    ps_out = _posix_ps_command_output() if active_dirs is None else ""
+    can_check_activity = active_dirs is not None or bool(ps_out)
 
     # Candidate bases:
-    # - System temp dir (legacy uc_ profiles)
+    # - System temp dir (legacy uc_ profiles), unless already scanned by the caller
     # - Dedicated nodriver profiles dir (current)
-    bases = [pathlib.Path(tempfile.gettempdir())]
+    bases = []
+    if uc_entries is None:
+        bases.append(pathlib.Path(tempfile.gettempdir()))
     try:
         bases.append(nodriver_temp_dir("profiles"))
     except Exception:
         pass
 
+    scanned: list[os.DirEntry] = list(uc_entries or ())
     for base in bases:
         try:
-            entries = list(os.scandir(str(base)))
+            scanned.extend(os.scandir(str(base)))
         except Exception:
             continue
 
-        for entry in entries:
+    def _stale_path(entry: os.DirEntry) -> str | None:
+        try:
+            if not entry.is_dir(follow_symlinks=False):
+                return None
+
             try:
-                if not entry.is_dir(follow_symlinks=False):
-                    continue
-                name = entry.name
-                if not name.startswith("uc_"):
-                    continue
-                path = pathlib.Path(entry.path)
+                # Served from the DirEntry, no extra path lookup.
+                age = now - float(entry.stat(follow_symlinks=False).st_mtime)
+            except Exception:
+                age = min_age_seconds
 
-                try:
-                    st = entry.stat(follow_symlinks=False)
-                    age = now - float(st.st_mtime)
-                except Exception:
-                    age = min_age_seconds
+            if age < min_age_seconds:
+                return None
 
-                if age < min_age_seconds:
-                    continue
+            empty, looks_like_profile = _profile_dir_state(entry.path)
+            if not (empty or looks_like_profile):
+                return None
 
-                empty = _is_empty_dir(path)
-                looks_like_profile = _looks_like_chrome_user_data_dir(path)
-                if not (empty or looks_like_profile):
-                    continue
+            # If we can't determine activity safely, only delete empty dirs.
+            if not can_check_activity and not empty:
+                return None
+            return entry.path
+        except Exception:
+            return None
 
-                # If we can't determine activity safely, only delete empty dirs.
-                if not can_check_activity and not empty:
-                    continue
+    # Cheap name filter first, so the pool only sees real candidates.
+    candidates = [e for e in scanned if e.name.startswith("uc_")]
+    victims = [p for p in _run_io_bound(_stale_path, candidates) if p]
 
-                # Skip anything that looks active.
-                if can_check_activity:
-                    real = os.path.realpath(str(path))
-                    needles = (
-                        f"--user-data-dir={path}",
-                        f"--user-data-dir={real}",
-                        f"--user-data-dir {path}",
-                        f"--user-data-dir {real}",
-                    )
-                    if any(n in ps_out for n in needles):
-                        continue
+    # Skip anything that looks active.
+    if can_check_activity and victims:
+        # Candidates are never symlinks themselves (is_dir(follow_symlinks=False)),
+        # so resolving their parent once gives the same result as realpath() on each.
+        reals = {}
+        for p in victims:
+            parent, name = os.path.split(p)
+            reals[p] = os.path.join(_realpath_cached(parent), name)
+        if active_dirs is not None:
+            active = active_dirs
+        else:
+            active = _referenced_user_data_dirs(ps_out, [*reals, *reals.values()])
+        victims = [p for p in victims if p not in active and reals[p] not in active]
 
-                try:
-                    if os.name == "posix" and os.path.exists("/bin/rm"):
-                        subprocess.run(
-                            ["/bin/rm", "-rf", str(path)],
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL,
-                            check=False,
-                        )
-                    else:
-                        shutil.rmtree(str(path), ignore_errors=True)
-                except Exception:
-                    pass
-            except Exception:
-                continue
+    _remove_dirs(victims)
 
 
 def cleanup_legacy_uc_profile_dirs(
     *,
     min_age_seconds: float = 120.0,
+    uc_entries: list[os.DirEntry] | None = None,
 ) -> None:
     """
     Backwards-compatible alias.
 
     Older nodriver versions exposed this helper as `cleanup_legacy_uc_profile_dirs()`.
     """
-    cleanup_stale_uc_profile_dirs(min_age_seconds=min_age_seconds)
+    cleanup_stale_uc_profile_dirs(
+        min_age_seconds=min_age_seconds, uc_entries=uc_entries
+    )
+
+
+def cleanup_all(
+    *,
+    scanned: tuple[list[str], list[os.DirEntry]] | None = None,
+) -> None:
+    """
+    Run all stale temp dir cleanups, sharing a single scan of the system temp dir.
+
+    `scanned` takes the result of an earlier `_scan_tempdir_once()`; by default the
+    temp dir is scanned here.
+    """
+    if scanned is None:
+        scanned = _scan_tempdir_once()
+    singleton_dirs, uc_entries = scanned
+    try:
+        cleanup_chromium_singleton_dirs(singleton_dirs=singleton_dirs)
+    except Exception:
+        pass
+    try:
+        cleanup_stale_uc_profile_dirs(uc_entries=uc_entries)
+    except Exception:
+        pass
+
+
+async def cleanup_chromium_singleton_dirs_async(**kwargs) -> None:
+    """`cleanup_chromium_singleton_dirs()` in a worker thread, so it doesn't block the loop."""
+    await asyncio.to_thread(cleanup_chromium_singleton_dirs, **kwargs)
+
+
+async def cleanup_all_async(
+    *,
+    scanned: tuple[list[str], list[os.DirEntry]] | None = None,
+) -> None:
+    """
+    `cleanup_all()` in a worker thread, so it can overlap with browser startup.
+
+    When running concurrently with a browser launch, pass `scanned` from a scan taken
+    *before* the launch: the new browser's own singleton dir is created without a
+    listening socket at first, and must not be picked up as a cleanup candidate.
+    """
+    await asyncio.to_thread(cleanup_all, scanned=scanned)
@@ -28,8 +28,9 @@ from typing import List, Tuple, Union
 from .. import cdp
 from . import tab, util
 from ._temp import (
+    _scan_tempdir_once,
+    cleanup_all_async,
     cleanup_chromium_singleton_dirs,
-    cleanup_stale_uc_profile_dirs,
     nodriver_temp_dir,
 )
 from ._contradict import ContraDict
@@ -72,6 +73,14 @@ def _looks_like_sandbox_error(output: str) -> bool:
     return False
 
 
+def _log_cleanup_result(task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.debug("stale temp dir cleanup failed", exc_info=exc)
+
+
 class Browser:
     """
     The Browser object is the "root" of the hierarchy and contains a reference
@@ -171,6 +180,8 @@ class Browser:
         self._proxy_forwarders = []
         self._is_updating = asyncio.Event()
         self._update_tasks: set = set()
+        # Background stale temp dir cleanup, overlapping with browser startup.
+        self._cleanup_task: asyncio.Task | None = None
         self.connection: Connection = None
         logger.debug("Session object initialized: %s" % vars(self))
 
@@ -485,17 +496,20 @@ class Browser:
                     except Exception:
                         pass
 
-                    # Proactively remove stale Chromium/Chrome singleton socket dirs in the system temp dir.
-                    # These can leak on crashes/forced kills and accumulate on long-running workloads.
-                    try:
-                        cleanup_chromium_singleton_dirs()
-                    except Exception:
-                        pass
-                    # Clean up stale temp profiles left behind by crashes/forced kills.
-                    try:
-                        cleanup_stale_uc_profile_dirs()
-                    except Exception:
-                        pass
+                    # Proactively remove stale Chromium/Chrome singleton socket dirs and temp
+                    # profiles left behind by crashes/forced kills. These accumulate on
+                    # long-running workloads.
+                    # The temp dir is scanned now, before our browser creates its own
+                    # singleton dir; the probing and removal then run in the background
+                    # while the browser starts.
+                    if self._cleanup_task is None or self._cleanup_task.done():
+                        try:
+                            self._cleanup_task = asyncio.create_task(
+                                cleanup_all_async(scanned=_scan_tempdir_once())
+                            )
+                            self._cleanup_task.add_done_callback(_log_cleanup_result)
+                        except Exception:
+                            pass
 
                     logger.debug(
                         "BROWSER EXECUTABLE PATH: %s", self.config.browser_executable_path
@@ -942,6 +956,17 @@ class Browser:
         except Exception:
             pass
 
+        # Same for the background stale-dir cleanup. Its worker thread finishes on
+        # its own; the task must not outlive a loop that closes right after this.
+        cleanup_task = getattr(self, "_cleanup_task", None)
+        cleanup_running = cleanup_task is not None and not cleanup_task.done()
+        if cleanup_running:
+            try:
+                cleanup_task.cancel()
+            except Exception:
+                pass
+        self._cleanup_task = None
+
         # Close any local proxy forwarders (used for authenticated proxy URLs).
         try:
             fws = getattr(self, "_proxy_forwarders", None) or []
@@ -1145,10 +1170,13 @@ class Browser:
 
         # Clean up any stale Chromium/Chrome singleton socket dirs in the system temp dir.
         # These can leak on crashes/forced kills and are not under the profile directory.
-        try:
-            cleanup_chromium_singleton_dirs()
-        except Exception:
-            pass
+        # Skipped while the background cleanup's thread may still be working on the
+        # same dirs; anything left is picked up by the next start().
+        if not cleanup_running:
+            try:
+                cleanup_chromium_singleton_dirs()
+            except Exception:
+                pass
 
         # Clean up browser output capture file (if any).
         try:
@@ -1219,6 +1247,15 @@ class Browser:
                     await asyncio.wait_for(self.connection.disconnect(), timeout=timeout)
                 except BaseException:
                     pass
+
+            # Let a still-running background cleanup finish, so its task isn't
+            # destroyed while pending when the loop goes away.
+            cleanup_task = getattr(self, "_cleanup_task", None)
+            if cleanup_task is not None and not cleanup_task.done():
+                try:
+                    await asyncio.wait({cleanup_task}, timeout=timeout)
+                except BaseException:
+                    pass
         finally:
             # Ensure the process is killed and temp dirs are removed even if aclose() is cancelled.
             self.stop()
@@ -4,17 +4,23 @@
 # and is released under the "GNU AFFERO GENERAL PUBLIC LICENSE".
 # Please see the LICENSE.txt file that should have been included as part of this package.
 
+import ctypes
+import errno
+import functools
+import hashlib
 import logging
 import os
 import pathlib
 import secrets
 import shutil
+import stat
 import sys
 import tempfile
+import time
 import zipfile
 from typing import List, Optional, TypeVar
 
-from ._temp import nodriver_temp_dir
+from ._temp import nodriver_temp_base, nodriver_temp_dir
 
 __all__ = [
     "Config",
@@ -45,6 +51,166 @@ def _is_executable_file(path: str) -> bool:
         return False
 
 
+def _find_manifest_dir(root: str, max_depth: int = 3) -> Optional[str]:
+    """
+    Breadth-first search for the directory holding the extension manifest.
+
+    Manifests virtually always live at the root or one level below it,
+    so the search stops at the first hit and never goes deeper than max_depth.
+    """
+    level = [root]
+    for _ in range(max_depth + 1):
+        next_level = []
+        for d in level:
+            try:
+                with os.scandir(d) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith("manifest.") and not entry.is_dir():
+                    return d
+            next_level.extend(
+                e.path for e in entries if e.is_dir(follow_symlinks=False)
+            )
+        if not next_level:
+            break
+        level = next_level
+    return None
+
+
+def _extension_cache_dir(src: pathlib.Path) -> Optional[str]:
+    """
+    Location of the extraction cache for a packaged extension.
+
+    The parent directory is keyed on the file's location, the entry inside it
+    on size and mtime, so an updated file gets a fresh entry instead of reusing
+    stale content and older versions can be found and pruned.
+    """
+    try:
+        st = src.stat()
+        digest = hashlib.sha1(
+            str(src.resolve()).encode("utf-8", "surrogateescape")
+        ).hexdigest()
+    except OSError:
+        return None
+    return os.path.join(
+        str(nodriver_temp_dir("extensions")),
+        "cache",
+        digest,
+        "%d-%d" % (st.st_size, st.st_mtime_ns),
+    )
+
+
+# Cached versions of an extension unused for this long are removed when a newer
+# version is stored; a browser started earlier may still have the old one loaded.
+_EXTENSION_CACHE_PRUNE_AGE = 24 * 60 * 60
+
+
+def _is_private_dir(path: str) -> bool:
+    """True when path is a real directory owned by us that nobody else can write to"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False
+    if not is_posix:
+        # Windows temp dirs are per-user and st_mode doesn't reflect ACLs.
+        return True
+    if st.st_uid != os.getuid():
+        return False
+    return not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _extension_cache_is_trusted(cache_dir: str) -> bool:
+    """
+    Check cache_dir and every parent up to the nodriver temp base.
+
+    The cache path is predictable, so in a shared temp dir another user could
+    otherwise plant an "extension" there for us to load.
+    """
+    top = os.path.dirname(str(nodriver_temp_base()))
+    path = cache_dir
+    while path and path != top:
+        if not _is_private_dir(path):
+            return False
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return True
+
+
+def _cached_extension_dir(src: pathlib.Path) -> Optional[str]:
+    """return the cached extraction of src, if it exists, is ours and holds a manifest"""
+    cache_dir = _extension_cache_dir(src)
+    if (
+        cache_dir
+        and _extension_cache_is_trusted(cache_dir)
+        and _find_manifest_dir(cache_dir)
+    ):
+        try:
+            # Mark as recently used, so it isn't pruned while still in use.
+            os.utime(cache_dir)
+        except OSError:
+            pass
+        return cache_dir
+    return None
+
+
+def _prune_extension_versions(cache_dir: str) -> None:
+    """remove cached extractions of older versions of the same file that went unused"""
+    parent, current = os.path.split(cache_dir)
+    cutoff = time.time() - _EXTENSION_CACHE_PRUNE_AGE
+    try:
+        with os.scandir(parent) as it:
+            stale = [
+                e.path
+                for e in it
+                if e.name != current
+                and e.stat(follow_symlinks=False).st_mtime < cutoff
+            ]
+    except OSError:
+        return
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _store_extension_dir(src: pathlib.Path, extracted: str) -> Optional[str]:
+    """
+    Move a fresh extraction into the cache.
+
+    Returns the cache path, or None when the extraction can't be cached,
+    in which case the caller keeps using (and cleaning up) `extracted`.
+    """
+    cache_dir = _extension_cache_dir(src)
+    if not cache_dir or not _find_manifest_dir(extracted):
+        return None
+    if _cached_extension_dir(src):
+        # Populated by a concurrent run in the meantime.
+        shutil.rmtree(extracted, ignore_errors=True)
+        return cache_dir
+    try:
+        cache_root = os.path.dirname(os.path.dirname(cache_dir))
+        os.makedirs(cache_root, mode=0o700, exist_ok=True)
+        os.makedirs(os.path.dirname(cache_dir), mode=0o700, exist_ok=True)
+        if not _extension_cache_is_trusted(os.path.dirname(cache_dir)):
+            return None
+        os.rename(extracted, cache_dir)
+    except OSError as e:
+        if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+            return None
+        # The rename is atomic, so whatever is there was published by another
+        # process that may already be using it: never touch it, drop our copy.
+        if not _cached_extension_dir(src):
+            return None
+        shutil.rmtree(extracted, ignore_errors=True)
+        return cache_dir
+    _prune_extension_versions(cache_dir)
+    return cache_dir
+
+
 class Config:
     """
     Config object
@@ -132,6 +298,7 @@ class Config:
                 browser_executable_path = find_chrome_executable()
 
         self._browser_args = browser_args
+        self._browser_args_cache = None
 
         self.browser_executable_path = browser_executable_path
         self.headless = headless
@@ -173,7 +340,12 @@ class Config:
 
     @property
     def browser_args(self):
-        return sorted(self._default_browser_args + self._browser_args)
+        # Sorted once and cached; invalidated whenever the arguments change.
+        if self._browser_args_cache is None:
+            self._browser_args_cache = tuple(
+                sorted(self._default_browser_args + self._browser_args)
+            )
+        return list(self._browser_args_cache)
 
     @property
     def no_sandbox(self) -> bool:
@@ -192,6 +364,7 @@ class Config:
     def user_data_dir(self, path: PathLike):
         self._user_data_dir = str(path)
         self._custom_data_dir = True
+        self._browser_args_cache = None
 
     @property
     def uses_custom_data_dir(self) -> bool:
@@ -214,8 +387,9 @@ class Config:
 
         if path.is_dir():
             # Normalize to the directory containing the manifest.
-            for item in path.rglob("manifest.*"):
-                path = item.parent
+            manifest_dir = _find_manifest_dir(str(path))
+            if manifest_dir:
+                path = pathlib.Path(manifest_dir)
             self._extension_sources.append(path)
         else:
             # Packaged extension file (e.g. .crx). We'll extract it at browser start,
@@ -228,7 +402,9 @@ class Config:
         Prepare the extension directories for a single browser run.
 
         - Directory sources are used as-is.
-        - File sources are extracted into a unique temp directory (tracked for cleanup).
+        - File sources are extracted once into a cache directory keyed on the file's
+          location, size and mtime, and reused by later runs. If caching fails they
+          are extracted into a unique temp directory (tracked for cleanup).
         """
         # Remove any stale temp extraction dirs from a previous run attempt.
         self.cleanup_extensions()
@@ -236,6 +412,11 @@ class Config:
         prepared: List[str] = []
         for src in self._extension_sources:
             if src.is_file():
+                cached = _cached_extension_dir(src)
+                if cached:
+                    # Shared across runs; intentionally not tracked for cleanup.
+                    prepared.append(cached)
+                    continue
                 tf = tempfile.mkdtemp(
                     prefix="extension_",
                     suffix=secrets.token_hex(4),
@@ -248,6 +429,10 @@ class Config:
                     # Best-effort cleanup of the just-created directory.
                     shutil.rmtree(tf, ignore_errors=True)
                     raise
+                cached = _store_extension_dir(src, tf)
+                if cached:
+                    prepared.append(cached)
+                    continue
                 self._temp_extension_dirs.add(tf)
                 prepared.append(tf)
             else:
@@ -276,38 +461,46 @@ class Config:
         # the host and port will be added when starting
         # the browser, as by the time it starts, the port
         # is probably already taken
-        args = self._default_browser_args.copy()
-        args += ["--user-data-dir=%s" % self.user_data_dir]
-        args += ["--disable-session-crashed-bubble"]
+        args = list(self._default_browser_args)
+        args.append(f"--user-data-dir={self.user_data_dir}")
+        args.append("--disable-session-crashed-bubble")
+
+        # Single pass over the user arguments for the flags we must not duplicate.
+        has_load_extension = False
+        has_extension_debugging = False
+        for a in self._browser_args:
+            a = str(a)
+            if a.startswith("--load-extension"):
+                has_load_extension = True
+            elif a.startswith("--enable-unsafe-extension-debugging"):
+                has_extension_debugging = True
 
         disabled_features = "IsolateOrigins,site-per-process"
         if self._extensions:
             disabled_features += ",DisableLoadExtensionCommandLineSwitch"
-        args += [f"--disable-features={disabled_features}"]
+        args.append(f"--disable-features={disabled_features}")
         if self._extensions:
             # Prepared by _prepare_extensions() (called by Browser.start()).
             # If a user explicitly sets --load-extension themselves, don't add ours.
-            if not any(str(a).startswith("--load-extension") for a in self._browser_args):
-                args += [
-                    "--load-extension=%s" % ",".join(str(_) for _ in self._extensions)
-                ]
-            if not any(
-                str(a).startswith("--enable-unsafe-extension-debugging")
-                for a in self._browser_args
-            ):
-                args += ["--enable-unsafe-extension-debugging"]
+            if not has_load_extension:
+                args.append(
+                    "--load-extension=" + ",".join(str(_) for _ in self._extensions)
+                )
+            if not has_extension_debugging:
+                args.append("--enable-unsafe-extension-debugging")
         if self.expert:
-            args += ["--disable-site-isolation-trials"]
+            args.append("--disable-site-isolation-trials")
         if self._browser_args:
-            args.extend([arg for arg in self._browser_args if arg not in args])
+            seen = set(args)
+            args.extend(arg for arg in self._browser_args if arg not in seen)
         if self.headless:
             args.append("--headless=new")
         if not self.sandbox:
             args.append("--no-sandbox")
         if self.host:
-            args.append("--remote-debugging-host=%s" % self.host)
+            args.append(f"--remote-debugging-host={self.host}")
         if self.port:
-            args.append("--remote-debugging-port=%s" % self.port)
+            args.append(f"--remote-debugging-port={self.port}")
         return args
 
     def add_argument(self, arg: str):
@@ -327,6 +520,7 @@ class Config:
                 % arg
             )
         self._browser_args.append(arg)
+        self._browser_args_cache = None
 
     def __repr__(self):
         s = f"{self.__class__.__name__}"
@@ -343,16 +537,15 @@ class Config:
         return s
 
 
+@functools.lru_cache(maxsize=1)
 def is_root():
     """
     helper function to determine if user trying to launch chrome
-    under linux as root, which needs some alternative handling
+    under linux as root, which needs some alternative handling.
+    the result is cached, as nodriver never changes its uid.
     :return:
     :rtype:
     """
-    import ctypes
-    import os
-
     try:
         return os.getuid() == 0
     except AttributeError:
@@ -371,7 +564,18 @@ def find_chrome_executable(return_all=False):
     """
     Finds the chrome, beta, canary, chromium executable
     and returns the disk path
+
+    The lookup is cached per process, so repeated Config() instantiation
+    does not rescan PATH.
     """
+    found = _find_chrome_executable(bool(return_all))
+    if return_all:
+        return list(found)
+    return found
+
+
+@functools.lru_cache(maxsize=2)
+def _find_chrome_executable(return_all):
     candidates = []
     if is_posix:
         for item in os.environ.get("PATH").split(os.pathsep):
@@ -401,31 +605,32 @@ def find_chrome_executable(return_all=False):
                     "Google/Chrome Canary/Application",
                 ):
                     candidates.append(os.sep.join((item, subitem, "chrome.exe")))
+
+    if not return_all:
+        # assuming the shortest path wins: a stable sort on length keeps the
+        # original order among equals, so the first valid hit is the winner
+        # and we can stop scanning there.
+        candidates.sort(key=len)
+
     rv = []
     for candidate in candidates:
-        if os.path.exists(candidate) and os.access(candidate, os.X_OK):
+        # access() is False for missing paths too, so no separate exists() stat.
+        if os.access(candidate, os.X_OK):
             logger.debug("%s is a valid candidate... " % candidate)
             rv.append(candidate)
+            if not return_all:
+                break
         else:
             logger.debug(
                 "%s is not a valid candidate because don't exist or not executable "
                 % candidate
             )
 
-    winner = None
-
     if return_all and rv:
-        return rv
-
-    if rv and len(rv) > 1:
-        # assuming the shortest path wins
-        winner = min(rv, key=lambda x: len(x))
-
-    elif len(rv) == 1:
-        winner = rv[0]
+        return tuple(rv)
 
-    if winner:
-        return os.path.normpath(winner)
+    if rv:
+        return os.path.normpath(rv[0])
 
     raise FileNotFoundError(
         "could not find a valid chrome browser binary. please make sure chrome is installed."
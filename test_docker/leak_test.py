@@ -9,37 +9,63 @@ Runs multiple browser sessions in a Fedora Docker container and checks for:
   5. Temp directory leaks
 
 Usage:
-    python3 leak_test.py [--iterations N] [--url URL]
+    python3 leak_test.py [--iterations N] [--url URL] [--tracemalloc]
+                         [--isolate | --concurrency K] [--slow] [--auto-reap]
 """
 
 from __future__ import annotations
 
 import argparse
+import array
 import asyncio
 import gc
-import glob
+import multiprocessing as mp
 import os
+import re
+import select
+import shutil
 import signal
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import tracemalloc
-import warnings
-from io import StringIO
 from typing import List, Tuple
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+_TMPDIR = tempfile.gettempdir()
+# /proc/self (rather than /proc/<pid>) stays correct in forked children.
+_FD_DIR = "/proc/self/fd"
+_STATUS = "/proc/self/status"
+
+# Lines of asyncio's "Task was destroyed but it is pending!" report, including
+# the "task: <Task pending ...>" line that follows it. One C-level scan over the
+# captured bytes instead of a per-line Python loop.
+_PENDING_TASK_RE = re.compile(
+    rb"(?m)^[^\n]*Task was destroyed but it is pending[^\n]*$|^[ \t]*task:[^\n]*$"
+)
+
+# Default warnings.showwarning output ("file:line: SomeWarning: message").
+_WARN_RE = re.compile(rb"(?m)^.*?Warning:\s*(.+)$")
+
+
 def get_rss_kb() -> int:
     """Current process RSS in KB (Linux /proc)."""
     try:
-        with open("/proc/self/status") as f:
-            for line in f:
-                if line.startswith("VmRSS:"):
-                    return int(line.split()[1])
+        # One unbuffered read; the whole status file fits in 4 KB.
+        fd = os.open(_STATUS, os.O_RDONLY)
+        try:
+            buf = os.read(fd, 4096)
+        finally:
+            os.close(fd)
+        i = buf.find(b"VmRSS:")
+        if i != -1:
+            j = buf.find(b"\n", i)
+            return int(buf[i + 6:j if j != -1 else None].split()[0])
     except Exception:
         pass
     try:
@@ -52,17 +78,25 @@ def get_rss_kb() -> int:
 def count_open_fds() -> int:
     """Count open file descriptors for this process."""
     try:
-        return len(os.listdir(f"/proc/{os.getpid()}/fd"))
+        # Count entries without materializing a list of names.
+        with os.scandir(_FD_DIR) as it:
+            return sum(1 for _ in it)
     except Exception:
         return -1
 
 
+# Set by --auto-reap once SIGCHLD is ignored and the kernel reaps children itself.
+_AUTO_REAP = False
+
+
 def reap_zombies():
     """Reap any zombie child processes.
 
     When running as PID 1 in Docker we inherit orphaned Chrome children
     (e.g. chrome_crashpad_handler). We must call waitpid to clean them up.
     """
+    if _AUTO_REAP:
+        return
     while True:
         try:
             pid, _ = os.waitpid(-1, os.WNOHANG)
@@ -72,25 +106,87 @@ def reap_zombies():
             break
 
 
+# Pending-task warnings listed in the final report.
+_MAX_REPORTED_WARNINGS = 10
+
+# Seconds an isolated worker (warm-up plus measured session) may take before it
+# is killed, and how long a worker that already reported may take to exit.
+_SESSION_TIMEOUT = 240.0
+_WORKER_EXIT_GRACE = 10.0
+
+_PS_PATH = shutil.which("ps") or "ps"
+# "STAT COMM" lines of `ps -eo stat,comm`, parsed in one pass over the raw bytes.
+_PS_RE = re.compile(rb"^\s*(\S+)\s+(.+?)\s*$", re.M)
+
+
+def _is_chrome_comm(comm: bytes) -> bool:
+    comm = comm.lower()
+    return b"chromium" in comm or b"chrome" in comm
+
+
+def scan_procs() -> Tuple[int, List[int]]:
+    """Single /proc pass: return (live Chrome process count, zombie pids)."""
+    live = 0
+    zombies = []
+    with os.scandir("/proc") as it:
+        for ent in it:
+            if not ent.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{ent.name}/stat", "rb") as f:
+                    data = f.read()
+            except OSError:
+                # Process exited in the meantime.
+                continue
+            # Format: "pid (comm) state ...". comm may itself contain ")" or spaces,
+            # so split on the first "(" and the last ")".
+            lpar = data.find(b"(")
+            rpar = data.rfind(b")")
+            if lpar == -1 or rpar == -1:
+                continue
+            if data[rpar + 2:rpar + 3] == b"Z":
+                zombies.append(int(ent.name))
+                continue
+            if _is_chrome_comm(data[lpar + 1:rpar]):
+                live += 1
+    return live, zombies
+
+
+def _reap_pids(pids: List[int]):
+    """Reap the given zombies; pids that aren't our children are skipped."""
+    for pid in pids:
+        try:
+            os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            pass
+
+
 def count_chrome_processes() -> int:
     """Count live (non-zombie) Chrome/Chromium processes."""
+    if os.path.isdir("/proc"):
+        try:
+            # The same pass finds the zombies, so reaping needs no second walk.
+            live, zombies = scan_procs()
+            _reap_pids(zombies)
+            return live
+        except Exception:
+            pass
     reap_zombies()
     try:
         # Use ps to get only running (non-zombie) chrome processes
+        # Absolute path + close_fds=False keeps CPython on its posix_spawn fast path
+        # (no fork of our growing address space); our FDs are non-inheritable anyway.
         result = subprocess.run(
-            ["ps", "-eo", "stat,comm"],
-            capture_output=True, text=True
+            [_PS_PATH, "-eo", "stat,comm"],
+            capture_output=True,
+            close_fds=False,
         )
         count = 0
-        for line in result.stdout.splitlines():
-            parts = line.split(None, 1)
-            if len(parts) < 2:
-                continue
-            stat, comm = parts
+        for m in _PS_RE.finditer(result.stdout):
             # Skip zombie processes (stat starts with Z)
-            if stat.startswith("Z"):
+            if m.group(1).startswith(b"Z"):
                 continue
-            if "chromium" in comm.lower() or "chrome" in comm.lower():
+            if _is_chrome_comm(m.group(2)):
                 count += 1
         return count
     except Exception:
@@ -99,84 +195,317 @@ def count_chrome_processes() -> int:
 
 def count_nodriver_temp_dirs() -> int:
     """Count nodriver temp profile dirs in /tmp."""
-    pattern = os.path.join(tempfile.gettempdir(), "nodriver_*")
-    return len(glob.glob(pattern))
+    try:
+        with os.scandir(_TMPDIR) as it:
+            return sum(1 for e in it if e.name.startswith("nodriver_"))
+    except OSError:
+        return 0
+
+
+class StderrCapture:
+    """Capture everything written to fd 2 while active.
+
+    Redirecting the file descriptor (rather than swapping ``sys.stderr``) also
+    catches output written by C code and child processes. A background thread
+    drains the pipe so writers never block on a full pipe buffer. ``data`` holds
+    an immutable snapshot of the output once the block exits.
+    """
+
+    # How often the drain thread checks whether it was told to stop.
+    _POLL_INTERVAL = 0.1
+
+    def __init__(self):
+        self.data = b""
+        self._buf = bytearray()
+        self._saved_fd = -1
+        self._thread = None
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        sys.stderr.flush()
+        r, w = os.pipe()
+        self._saved_fd = os.dup(2)
+        os.dup2(w, 2)
+        os.close(w)
+        self._thread = threading.Thread(target=self._drain, args=(r,), daemon=True)
+        self._thread.start()
+        return self
+
+    def _drain(self, r: int):
+        try:
+            while not self._stop.is_set():
+                if not select.select([r], [], [], self._POLL_INTERVAL)[0]:
+                    continue
+                chunk = os.read(r, 65536)
+                if not chunk:
+                    break
+                self._buf += chunk
+        finally:
+            os.close(r)
+
+    def __exit__(self, *exc_info):
+        try:
+            sys.stderr.flush()
+        except Exception:
+            pass
+        # Restoring fd 2 drops the last write end we hold, so the reader sees EOF
+        # (unless a leftover child process still holds it; hence the timeout).
+        os.dup2(self._saved_fd, 2)
+        os.close(self._saved_fd)
+        self._thread.join(timeout=5)
+        if self._thread.is_alive():
+            # Stop draining: the thread closes the read end itself, so it neither
+            # counts as a leaked FD nor keeps growing the buffer being scanned.
+            self._stop.set()
+            self._thread.join()
+        self.data = bytes(self._buf)
+        return False
 
 
 # ---------------------------------------------------------------------------
 # Single session run
 # ---------------------------------------------------------------------------
 
-def run_single_session(url: str, headless: bool = True) -> Tuple[str, List[str]]:
-    """
-    Run a single browser session and return (html_length, warnings_list).
-    Captures stderr to detect pending-task warnings.
+async def _wait_until_loaded(page, timeout: float = 10.0, interval: float = 0.1) -> bool:
+    """Poll ``document.readyState`` until "complete"; False on timeout."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        try:
+            state = await page.evaluate("document.readyState", return_by_value=True)
+        except Exception:
+            # The execution context can be replaced mid-navigation; try again.
+            state = None
+        if state == "complete":
+            return True
+        await asyncio.sleep(interval)
+    return False
+
+
+async def _browse(url: str, headless: bool = True, slow: bool = False) -> int:
+    """One browser session with its own Config; returns the page's HTML length.
+
+    Waits for the page's load to complete, or a fixed 3 seconds with ``slow``;
+    raises TimeoutError when the page never completes loading.
     """
     import nodriver as uc
 
-    old_stderr = sys.stderr
-    captured = StringIO()
-    sys.stderr = captured
+    config = uc.Config(
+        headless=headless,
+        sandbox=False,
+        browser_args=["--disable-gpu", "--disable-dev-shm-usage", "--no-first-run"],
+    )
+    browser = await uc.start(config)
+    try:
+        page = await browser.get(url)
+        if slow:
+            await asyncio.sleep(3)
+        elif not await _wait_until_loaded(page):
+            # Recorded as a failed session by run_sessions; aclose() still runs.
+            raise TimeoutError(f"{url} did not finish loading")
+        html = await page.get_content()
+        html_size = len(html) if html else 0
+        # Only the size is needed; release the page source before aclose() so it
+        # doesn't inflate the RSS this test is measuring.
+        del html
+        return html_size
+    finally:
+        await browser.aclose()
+
 
-    warning_list = []
-    old_showwarning = warnings.showwarning
+def run_sessions(
+    url: str,
+    count: int = 1,
+    headless: bool = True,
+    loop: asyncio.AbstractEventLoop | None = None,
+    slow: bool = False,
+) -> Tuple[List[int], List[str], List[str], List[str]]:
+    """
+    Run ``count`` browser sessions concurrently and return
+    (html_lengths, warnings_list, python_warnings, session_errors).
+    Captures stderr to detect pending-task warnings and Python warnings, which
+    the capture would otherwise swallow. A session that raises
+    reports 0 bytes and its exception in ``session_errors``; the others still
+    run to completion, including their ``aclose()``.
+
+    Pass ``loop`` to reuse one event loop across calls; otherwise a
+    fresh loop is created and closed for this call.
+    """
+    html_sizes: List[int] = []
+    session_errors: List[str] = []
+    leftover_tasks: List[str] = []
 
-    def capture_warning(message, category, filename, lineno, file=None, line=None):
-        warning_list.append(str(message))
-        old_showwarning(message, category, filename, lineno, file, line)
+    with StderrCapture() as captured:
+        own_loop = loop is None
+        if own_loop:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
 
-    warnings.showwarning = capture_warning
+        try:
+            async def _sessions():
+                return await asyncio.gather(
+                    *(_browse(url, headless, slow) for _ in range(count)),
+                    return_exceptions=True,
+                )
+
+            for result in loop.run_until_complete(_sessions()):
+                if isinstance(result, BaseException):
+                    html_sizes.append(0)
+                    session_errors.append(f"session failed: {result!r}")
+                else:
+                    html_sizes.append(result)
+
+            # aclose() should have awaited everything it started; anything left is
+            # exactly the kind of leak this test is looking for, so report it.
+            remaining = asyncio.all_tasks(loop)
+            if remaining:
+                leftover_tasks.append(f"{len(remaining)} tasks still pending after aclose")
+                # Cancel so they don't carry over into the next session on a shared loop.
+                for t in remaining:
+                    t.cancel()
+                loop.run_until_complete(asyncio.gather(*remaining, return_exceptions=True))
+        finally:
+            if own_loop:
+                try:
+                    # A shared loop is shut down once by its owner, not after every call.
+                    loop.run_until_complete(loop.shutdown_asyncgens())
+                    loop.close()
+                except Exception:
+                    pass
 
-    html_size = 0
+    # Reap zombies left by Chrome's child processes
+    reap_zombies()
+
+    pending_warnings = [
+        m.group(0).strip().decode("utf-8", errors="replace")
+        for m in _PENDING_TASK_RE.finditer(captured.data)
+    ]
+    pending_warnings.extend(leftover_tasks)
+    python_warnings = [
+        m.group(1).strip().decode("utf-8", errors="replace")
+        for m in _WARN_RE.finditer(captured.data)
+    ]
+    return html_sizes, pending_warnings, python_warnings, session_errors
+
+
+def run_single_session(
+    url: str,
+    headless: bool = True,
+    loop: asyncio.AbstractEventLoop | None = None,
+    slow: bool = False,
+) -> Tuple[str, List[str], List[str], List[str]]:
+    """
+    Run a single browser session and return
+    (html_length, warnings_list, python_warnings, session_errors).
+    See :func:`run_sessions`.
+    """
+    html_sizes, pending_warnings, python_warnings, session_errors = run_sessions(
+        url, 1, headless, loop, slow
+    )
+    return str(html_sizes[0]), pending_warnings, python_warnings, session_errors
+
+
+def _session_worker(conn, url: str, headless: bool, slow: bool):
+    """Child-process entry point for :func:`run_isolated_session`.
+
+    Runs a warm-up session and then a measured one on the same event loop, so the
+    one-time cost of a first session (event loop, threads, allocator arenas) isn't
+    reported as growth. Reports the measured session's own RSS/FD growth and exits
+    nonzero when either session failed.
+    """
+    html_size, pending_warnings, python_warnings, session_errors = "0", [], [], []
+    rss_delta = fd_delta = None
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
-
     try:
-        async def _session():
-            nonlocal html_size
-            config = uc.Config(
-                headless=headless,
-                sandbox=False,
-                browser_args=["--disable-gpu", "--disable-dev-shm-usage", "--no-first-run"],
+        for measured in (False, True):
+            if measured:
+                gc.collect()
+                start_rss = get_rss_kb()
+                start_fds = count_open_fds()
+            size, pending, py_warnings, errors = run_single_session(
+                url, headless, loop, slow
             )
-            browser = await uc.start(config)
-            try:
-                page = await browser.get(url)
-                await asyncio.sleep(3)
-                html = await page.get_content()
-                html_size = len(html) if html else 0
-            finally:
-                await browser.aclose()
-
-        loop.run_until_complete(_session())
-
-        # Drain any remaining tasks
-        try:
-            pending = asyncio.all_tasks(loop)
-            for t in pending:
-                t.cancel()
-            if pending:
-                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-        except Exception:
-            pass
+            pending_warnings.extend(pending)
+            python_warnings.extend(py_warnings)
+            session_errors.extend(errors)
+            if measured:
+                gc.collect()
+                html_size = size
+                rss_delta = get_rss_kb() - start_rss
+                fd_delta = count_open_fds() - start_fds
+    except BaseException as e:
+        session_errors.append(f"session worker failed: {e!r}")
     finally:
         try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
             loop.close()
         except Exception:
             pass
-        sys.stderr = old_stderr
-        warnings.showwarning = old_showwarning
-
-    # Reap zombies left by Chrome's child processes
-    reap_zombies()
-
-    stderr_output = captured.getvalue()
-    pending_warnings = [
-        line for line in stderr_output.splitlines()
-        if "Task was destroyed but it is pending" in line
-        or "task:" in line.strip()[:5]
-    ]
-    return str(html_size), pending_warnings
+    try:
+        conn.send((
+            html_size,
+            pending_warnings,
+            python_warnings,
+            session_errors,
+            rss_delta,
+            fd_delta,
+        ))
+    finally:
+        conn.close()
+    if session_errors:
+        sys.exit(1)
+
+
+def run_isolated_session(
+    url: str,
+    headless: bool = True,
+    slow: bool = False,
+    timeout: float = _SESSION_TIMEOUT,
+) -> Tuple[
+    str, List[str], List[str], List[str], int | None, int | None, int | None
+]:
+    """
+    Run a browser session in a forked child process, after a warm-up session.
+
+    Keeps each session's retained garbage out of the driver process, so its
+    RSS and FD counts don't accumulate across iterations; the leak checks use
+    the worker's own growth instead.
+    Returns (html_length, warnings_list, python_warnings, session_errors,
+    rss_delta_kb, fd_delta, exitcode). The deltas cover the worker's measured
+    session and are None when it wasn't measured or the worker reported nothing;
+    a nonzero exitcode means a session failed, crashed or was killed. A worker
+    that reports nothing within ``timeout`` seconds is killed.
+    """
+    ctx = mp.get_context("fork")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_session_worker, args=(child_conn, url, headless, slow))
+    # Don't let the child inherit (and re-emit) unflushed output.
+    sys.stdout.flush()
+    sys.stderr.flush()
+    proc.start()
+    child_conn.close()
+    html_size, pending_warnings, python_warnings, session_errors = "0", [], [], []
+    rss_delta = fd_delta = None
+    try:
+        if parent_conn.poll(timeout):
+            (html_size, pending_warnings, python_warnings, session_errors,
+             rss_delta, fd_delta) = parent_conn.recv()
+        else:
+            session_errors = [f"session worker timed out after {timeout:.0f}s"]
+            proc.kill()
+    except EOFError:
+        pass
+    finally:
+        parent_conn.close()
+    proc.join(_WORKER_EXIT_GRACE)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+    return (
+        html_size, pending_warnings, python_warnings, session_errors,
+        rss_delta, fd_delta, proc.exitcode,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -189,19 +518,59 @@ def main():
                         help="Number of browser sessions to run (default: 3)")
     parser.add_argument("--url", default="https://example.com",
                         help="URL to fetch (default: https://example.com)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Report top allocations via tracemalloc (slows every allocation)")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Run each session in a forked child process")
+    parser.add_argument("--concurrency", "-c", type=int, default=1,
+                        help="Number of browser sessions to run at once (default: 1)")
+    parser.add_argument("--slow", action="store_true",
+                        help="Sleep a fixed 3s per page instead of waiting for load (debugging)")
+    parser.add_argument("--auto-reap", action="store_true",
+                        help="Ignore SIGCHLD so the kernel reaps exited children (Linux only)")
     args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.isolate and args.concurrency > 1:
+        parser.error("--isolate and --concurrency are mutually exclusive")
+    if args.auto_reap:
+        if sys.platform != "linux":
+            parser.error("--auto-reap is only supported on Linux")
+        # multiprocessing's join() relies on waitpid, which fails once SIGCHLD is ignored.
+        if args.isolate:
+            parser.error("--auto-reap and --isolate are mutually exclusive")
+        global _AUTO_REAP
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        _AUTO_REAP = True
 
     print("=" * 70)
     print("  nodriver Leak Test — Fedora Docker")
     print("=" * 70)
     print(f"  URL:        {args.url}")
     print(f"  Iterations: {args.iterations}")
+    if args.concurrency > 1:
+        print(f"  Concurrency: {args.concurrency}")
     print(f"  Python:     {sys.version}")
     print()
 
     # ── Pre-test baseline ────────────────────────────────────────────
+    if args.isolate:
+        # Import once here so every worker inherits it and the import isn't
+        # counted as growth of each worker's session.
+        import nodriver  # noqa: F401
+    # Move everything alive now (imports, interpreter state) to the permanent
+    # generation, so per-iteration collections only traverse session objects.
     gc.collect()
-    tracemalloc.start()
+    gc.freeze()
+    if args.tracemalloc:
+        tracemalloc.start(1)
+
+    # One event loop for all sessions: loop setup (epoll, self-pipe) is paid once.
+    # Created before the baseline so its own FDs don't count as a leak.
+    pre_loop_fds = count_open_fds()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop_fds = count_open_fds() - pre_loop_fds
 
     baseline_rss = get_rss_kb()
     baseline_fds = count_open_fds()
@@ -209,40 +578,107 @@ def main():
     baseline_temps = count_nodriver_temp_dirs()
 
     print(f"  Baseline RSS:      {baseline_rss:>8} KB")
-    print(f"  Baseline FDs:      {baseline_fds:>8}")
+    print(f"  Baseline FDs:      {baseline_fds:>8}  (event loop: {loop_fds})")
     print(f"  Baseline Chrome:   {baseline_chrome:>8}")
     print(f"  Baseline TempDirs: {baseline_temps:>8}")
     print("-" * 70)
 
     # ── Run iterations ────────────────────────────────────────────────
-    rss_samples = [baseline_rss]
-    total_pending_warnings = []
+    # Sessions run in rounds of --concurrency; metrics are sampled after each round.
+    # Compact unsigned 32-bit storage; long soak runs keep one sample per round.
+    rss_samples = array.array("I", [baseline_rss])
+    # Sessions completed at each RSS sample, so growth is reported per session.
+    session_counts = array.array("I", [0])
+    # Only the first few warnings are printed, so keep just those plus a count;
+    # noisy long runs then don't grow this without bound.
+    first_pending_warnings: List[str] = []
+    total_pending_count = 0
+    first_python_warnings: List[str] = []
+    total_python_warning_count = 0
     all_passed = True
+    # Sessions that raised, plus isolated workers that crashed or were killed.
+    failed_sessions = 0
+    # With --isolate the driver does no session work; the RSS/FD growth of each
+    # worker's measured session is what the leak checks look at.
+    worker_rss_deltas = array.array("i")
+    worker_fd_deltas = array.array("i")
+
+    done = 0
+    while done < args.iterations:
+        first = done + 1
+        count = min(args.concurrency, args.iterations - done)
+        done += count
+        if count == 1:
+            print(f"\n  ▶ Iteration {done}/{args.iterations}", flush=True)
+        else:
+            print(f"\n  ▶ Iterations {first}-{done}/{args.iterations}", flush=True)
+
+        worker_line = None
+        if args.isolate:
+            # The child builds its own event loop; a forked copy of ours would
+            # share the parent's epoll instance.
+            (html_size, pending_warnings, python_warnings, session_errors,
+             rss_delta, fd_delta, exitcode) = run_isolated_session(
+                args.url, slow=args.slow
+            )
+            if exitcode != 0 and not session_errors:
+                session_errors = [f"session worker exited with code {exitcode}"]
+            if rss_delta is not None:
+                worker_rss_deltas.append(rss_delta)
+                worker_fd_deltas.append(fd_delta)
+                worker_line = (
+                    f"    Worker:      Δ {rss_delta:+d} KB  Δ {fd_delta:+d} FDs"
+                    f"  exit code {exitcode}"
+                )
+            else:
+                worker_line = f"    Worker:      no report  exit code {exitcode}"
+        else:
+            html_sizes, pending_warnings, python_warnings, session_errors = (
+                run_sessions(args.url, count, loop=loop, slow=args.slow)
+            )
+            html_size = " / ".join(str(n) for n in html_sizes)
+        failed_sessions += len(session_errors)
 
-    for i in range(1, args.iterations + 1):
-        print(f"\n  ▶ Iteration {i}/{args.iterations}")
-
-        html_size, pending_warnings = run_single_session(args.url)
-
-        gc.collect()
+        gc.collect(2)
         current_rss = get_rss_kb()
         current_fds = count_open_fds()
         current_chrome = count_chrome_processes()
         current_temps = count_nodriver_temp_dirs()
 
         rss_samples.append(current_rss)
-
-        print(f"    HTML size:   {html_size:>10} bytes")
-        print(f"    RSS:         {current_rss:>8} KB  (Δ {current_rss - baseline_rss:+d} KB)")
-        print(f"    FDs:         {current_fds:>8}     (Δ {current_fds - baseline_fds:+d})")
-        print(f"    Chrome procs:{current_chrome:>8}")
-        print(f"    Temp dirs:   {current_temps:>8}")
-        print(f"    Pending task warnings: {len(pending_warnings)}")
+        session_counts.append(done)
+
+        # Build the iteration report and emit it with a single write.
+        lines = [
+            f"    HTML size:   {html_size:>10} bytes",
+            f"    RSS:         {current_rss:>8} KB  (Δ {current_rss - baseline_rss:+d} KB)",
+            f"    FDs:         {current_fds:>8}     (Δ {current_fds - baseline_fds:+d})",
+            f"    Chrome procs:{current_chrome:>8}",
+            f"    Temp dirs:   {current_temps:>8}",
+            f"    Pending task warnings: {len(pending_warnings)}",
+        ]
+        if worker_line:
+            lines.append(worker_line)
+        lines.extend(f"      ✘  {e}" for e in session_errors)
 
         if pending_warnings:
-            total_pending_warnings.extend(pending_warnings)
-            for w in pending_warnings:
-                print(f"      ⚠  {w}")
+            total_pending_count += len(pending_warnings)
+            if len(first_pending_warnings) < _MAX_REPORTED_WARNINGS:
+                first_pending_warnings.extend(
+                    pending_warnings[:_MAX_REPORTED_WARNINGS - len(first_pending_warnings)]
+                )
+            lines.extend(f"      ⚠  {w}" for w in pending_warnings)
+
+        if python_warnings:
+            total_python_warning_count += len(python_warnings)
+            if len(first_python_warnings) < _MAX_REPORTED_WARNINGS:
+                first_python_warnings.extend(
+                    python_warnings[:_MAX_REPORTED_WARNINGS - len(first_python_warnings)]
+                )
+            lines.append(f"    Python warnings: {len(python_warnings)}")
+            lines.extend(f"      ⚠  {w}" for w in python_warnings)
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
     # ── Post-test analysis ────────────────────────────────────────────
     print()
@@ -256,36 +692,53 @@ def main():
     final_temps = count_nodriver_temp_dirs()
 
     # tracemalloc snapshot
-    snapshot = tracemalloc.take_snapshot()
-    top_stats = snapshot.statistics("lineno")
+    top_stats = []
+    if args.tracemalloc:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, "<frozen *>"),
+            tracemalloc.Filter(False, "<unknown>"),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+        # Only the top 5 are shown; filtering first shrinks the group-by and sort.
+        top_stats = snapshot.statistics("lineno")[:5]
 
     # 1. Pending task warnings
-    print(f"\n  ❶ Pending Task Warnings: {len(total_pending_warnings)}")
-    if total_pending_warnings:
+    print(f"\n  ❶ Pending Task Warnings: {total_pending_count}")
+    if total_pending_count:
         print("    ✘ FAIL — pending tasks detected:")
-        for w in total_pending_warnings[:10]:
+        for w in first_pending_warnings:
             print(f"      {w}")
         all_passed = False
     else:
         print("    ✔ PASS — no pending task warnings")
 
     # 2. Memory growth
-    # Use growth between iter 1 and the final iteration to exclude startup overhead.
-    if len(rss_samples) >= 3:
-        incremental_growth = rss_samples[-1] - rss_samples[1]
-        incremental_iters = max(args.iterations - 1, 1)
-    else:
-        incremental_growth = final_rss - baseline_rss
-        incremental_iters = max(args.iterations, 1)
-    growth_per_iter = incremental_growth / incremental_iters
     # Allow up to 5 MB growth per iteration (beyond the first)
     mem_threshold_kb = 5 * 1024
     print(f"\n  ❷ Memory (RSS)")
-    print(f"    Baseline:           {baseline_rss:>8} KB")
-    print(f"    After 1st iter:     {rss_samples[1] if len(rss_samples) > 1 else 'N/A':>8} KB")
-    print(f"    Final:              {final_rss:>8} KB")
-    print(f"    Incremental growth: {incremental_growth:>+8} KB  (iter 2..{args.iterations})")
-    print(f"    Per iteration:      {growth_per_iter:>+8.0f} KB")
+    if args.isolate:
+        # Each worker measures its second session, after a warm-up one, so its
+        # growth is that session's retained memory without first-session overhead.
+        n_workers = len(worker_rss_deltas)
+        growth_per_iter = sum(worker_rss_deltas) / n_workers if n_workers else 0
+        print(f"    Driver:             {baseline_rss:>8} KB → {final_rss} KB")
+        print(f"    Worker growth max:  {max(worker_rss_deltas, default=0):>+8} KB  ({n_workers} workers)")
+        print(f"    Per iteration:      {growth_per_iter:>+8.0f} KB")
+    else:
+        # Use growth between the first round and the final one to exclude startup overhead.
+        if len(rss_samples) >= 3:
+            incremental_growth = rss_samples[-1] - rss_samples[1]
+            incremental_iters = max(session_counts[-1] - session_counts[1], 1)
+        else:
+            incremental_growth = final_rss - baseline_rss
+            incremental_iters = max(args.iterations, 1)
+        growth_per_iter = incremental_growth / incremental_iters
+        print(f"    Baseline:           {baseline_rss:>8} KB")
+        print(f"    After 1st iter:     {rss_samples[1] if len(rss_samples) > 1 else 'N/A':>8} KB")
+        print(f"    Final:              {final_rss:>8} KB")
+        first_incremental = session_counts[1] + 1 if len(session_counts) > 1 else 1
+        print(f"    Incremental growth: {incremental_growth:>+8} KB  (iter {first_incremental}..{args.iterations})")
+        print(f"    Per iteration:      {growth_per_iter:>+8.0f} KB")
     if growth_per_iter > mem_threshold_kb:
         print(f"    ✘ FAIL — growth exceeds {mem_threshold_kb} KB/iter threshold")
         all_passed = False
@@ -293,9 +746,15 @@ def main():
         print(f"    ✔ PASS — within {mem_threshold_kb} KB/iter threshold")
 
     # 3. File descriptor leaks
-    fd_growth = final_fds - baseline_fds
-    print(f"\n  ❸ File Descriptors")
-    print(f"    Baseline: {baseline_fds:>4}    Final: {final_fds:>4}    Δ {fd_growth:+d}")
+    if args.isolate:
+        # FDs a worker still holds after its measured session.
+        fd_growth = max(worker_fd_deltas, default=0)
+        print(f"\n  ❸ File Descriptors")
+        print(f"    Worst worker:  Δ {fd_growth:+d}    Driver: {baseline_fds:>4} → {final_fds}")
+    else:
+        fd_growth = final_fds - baseline_fds
+        print(f"\n  ❸ File Descriptors")
+        print(f"    Baseline: {baseline_fds:>4}    Final: {final_fds:>4}    Δ {fd_growth:+d}")
     if fd_growth > 5:
         print("    ✘ FAIL — FD leak detected")
         all_passed = False
@@ -322,8 +781,29 @@ def main():
 
     # 6. Top memory allocations (informational)
     print(f"\n  ❻ Top Memory Allocations (tracemalloc)")
-    for stat in top_stats[:5]:
-        print(f"    {stat}")
+    if args.tracemalloc:
+        for stat in top_stats:
+            print(f"    {stat}")
+    else:
+        print("    skipped (enable with --tracemalloc)")
+
+    # 7. Failed sessions
+    print(f"\n  ❼ Failed Sessions: {failed_sessions}")
+    if failed_sessions:
+        print("    ✘ FAIL — sessions raised, crashed or were killed")
+        all_passed = False
+    else:
+        print("    ✔ PASS — all sessions completed")
+
+    # 8. Python warnings (RuntimeWarning "never awaited", ...)
+    print(f"\n  ❽ Python Warnings: {total_python_warning_count}")
+    if total_python_warning_count:
+        print("    ✘ FAIL — warnings emitted during sessions:")
+        for w in first_python_warnings:
+            print(f"      {w}")
+        all_passed = False
+    else:
+        print("    ✔ PASS — no Python warnings")
 
     # ── Final verdict ─────────────────────────────────────────────────
     print()
@@ -334,7 +814,10 @@ def main():
         print("  ❌  SOME CHECKS FAILED — see above")
     print("=" * 70)
 
-    tracemalloc.stop()
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+    if args.tracemalloc:
+        tracemalloc.stop()
     sys.exit(0 if all_passed else 1)
 
 
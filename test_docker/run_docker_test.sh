@@ -2,7 +2,8 @@
 # Build and run the Fedora Docker leak test for nodriver.
 #
 # Usage:
-#   ./run_docker_test.sh [--iterations N] [--url URL]
+#   ./run_docker_test.sh [--iterations N] [--url URL] [--tracemalloc]
+#                        [--isolate | --concurrency K] [--slow] [--auto-reap]
 #
 # Examples:
 #   ./run_docker_test.sh